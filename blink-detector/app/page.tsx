@@ -22,12 +22,19 @@ interface FaceMeshResults {
 // Eye landmark indices for MediaPipe face mesh (EXACT COPY FROM PYTHON)
 const LEFT_EYE = [362, 385, 387, 263, 373, 380]
 const RIGHT_EYE = [33, 160, 158, 133, 153, 144]
+// Both eyes in one index array so a single pass gathers all 12 points (left first, then right)
+const EYE_IDX = Int32Array.from([...LEFT_EYE, ...RIGHT_EYE])
 
 // Blink detection parameters (EXACT COPY FROM PYTHON)
 const BASELINE_FRAMES = 30
 const EAR_THRESHOLD_RATIO = 0.75  // 75% of baseline
 const MIN_BLINK_FRAMES = 3
 const ROLLING_WINDOW_MINUTES = 4  // Note: Python has bug, shows 2 but uses 4
+const INFERENCE_FRAME_STRIDE = 2  // Run FaceMesh on 1 of every N frames, reuse landmarks in between
+// Blink duration counted in real FaceMesh samples: 2 samples at 15Hz span the same >=67ms
+// as Python's 3 consecutive frames at 30Hz
+const MIN_BLINK_SAMPLES = Math.ceil(MIN_BLINK_FRAMES / INFERENCE_FRAME_STRIDE)
+const OVERLAY_REFRESH_HZ = 4  // Re-render the EAR/rate/session readouts at most this often
 
 // Alert parameters (EXACT COPY FROM PYTHON) 
 const DEFAULT_LOW_BLINK_THRESHOLD = 10
@@ -35,51 +42,92 @@ const ALERT_COOLDOWN = 5  // seconds
 const MIN_SESSION_TIME = 5  // seconds
 const MIN_BLINKS_FOR_ALERT = 3
 
-interface EyeLandmark {
-  x: number
-  y: number
+// Reusable scratch buffer for the 12 eye points, packed as [x0, y0, x1, y1, ...]
+// so the per-frame landmark math allocates nothing; each eye is a view onto its half
+const eyePoints = new Float32Array(2 * EYE_IDX.length)
+const leftEyePoints = eyePoints.subarray(0, 2 * LEFT_EYE.length)
+const rightEyePoints = eyePoints.subarray(2 * LEFT_EYE.length)
+
+// EXACT PORT: get_eye_landmarks function from Python (writes into a caller-owned buffer)
+function getEyeLandmarks(
+  faceLandmarks: NormalizedLandmark[],
+  indices: Int32Array,
+  frameWidth: number,
+  frameHeight: number,
+  out: Float32Array
+): Float32Array {
+  for (let k = 0; k < indices.length; k++) {
+    const landmark = faceLandmarks[indices[k]]
+    out[2 * k] = landmark.x * frameWidth
+    out[2 * k + 1] = landmark.y * frameHeight
+  }
+  return out
 }
 
 // EXACT PORT: eye_aspect_ratio function from Python
-function eyeAspectRatio(eyeLandmarks: EyeLandmark[]): number {
-  // Vertical distances
-  const A = Math.sqrt(
-    Math.pow(eyeLandmarks[1].x - eyeLandmarks[5].x, 2) +
-    Math.pow(eyeLandmarks[1].y - eyeLandmarks[5].y, 2)
-  )
-  const B = Math.sqrt(
-    Math.pow(eyeLandmarks[2].x - eyeLandmarks[4].x, 2) +
-    Math.pow(eyeLandmarks[2].y - eyeLandmarks[4].y, 2)
-  )
-  // Horizontal distance
-  const C = Math.sqrt(
-    Math.pow(eyeLandmarks[0].x - eyeLandmarks[3].x, 2) +
-    Math.pow(eyeLandmarks[0].y - eyeLandmarks[3].y, 2)
-  )
+function eyeAspectRatio(pts: Float32Array): number {
+  // Vertical distances (p1-p5, p2-p4)
+  const A = Math.hypot(pts[2] - pts[10], pts[3] - pts[11])
+  const B = Math.hypot(pts[4] - pts[8], pts[5] - pts[9])
+  // Horizontal distance (p0-p3)
+  const C = Math.hypot(pts[0] - pts[6], pts[1] - pts[7])
   
   return (A + B) / (2.0 * C)
 }
 
+// EXACT PORT: Both eyes validation from Python's main loop, as a pure scalar step.
+// Returns the next consecutive closed-eye frame count (0 when the eyes are open).
+function stepBlinkFrames(leftEAR: number, rightEAR: number, threshold: number, consecutiveFrames: number): number {
+  const bothEyesClosed = (leftEAR < threshold) && (rightEAR < threshold)
+  return bothEyesClosed ? consecutiveFrames + 1 : 0
+}
+
+// Drop timestamps older than the cutoff from the front of the (sorted) window in place.
+// The scan stops at the first live entry, and the array is only rewritten (one splice) on
+// frames where something actually expired; the window holds at most a few hundred entries.
+function evictExpired(blinkTimestamps: number[], cutoffTime: number): void {
+  let expired = 0
+  while (expired < blinkTimestamps.length && blinkTimestamps[expired] < cutoffTime) {
+    expired++
+  }
+  if (expired > 0) {
+    blinkTimestamps.splice(0, expired)
+  }
+}
+
 // EXACT PORT: calculate_blink_rate function from Python
-function calculateBlinkRate(blinkTimestamps: number[], windowMinutes = ROLLING_WINDOW_MINUTES, startTime?: number): number {
-  const currentTime = Date.now()
-  const cutoffTime = currentTime - (windowMinutes * 60 * 1000)
-  
-  const recentBlinks = blinkTimestamps.filter(t => t >= cutoffTime)
-  
-  if (recentBlinks.length === 0) return 0
+// Expects blinkTimestamps to already be trimmed to the window with evictExpired
+function calculateBlinkRate(blinkTimestamps: number[], windowMinutes = ROLLING_WINDOW_MINUTES, startTime?: number, now?: number): number {
+  const currentTime = now ?? Date.now()
+  if (blinkTimestamps.length === 0) return 0
   
   let elapsedTime: number
   if (startTime !== undefined) {
     elapsedTime = Math.min(currentTime - startTime, windowMinutes * 60 * 1000)
   } else {
-    const timeSinceFirst = currentTime - recentBlinks[0]
+    const timeSinceFirst = currentTime - blinkTimestamps[0]
     elapsedTime = Math.min(timeSinceFirst, windowMinutes * 60 * 1000)
   }
   
   const elapsedMinutes = Math.max(elapsedTime / (60 * 1000), 1/60)
   
-  return recentBlinks.length / elapsedMinutes
+  return blinkTimestamps.length / elapsedMinutes
+}
+
+// Shared audio context for alert tones, created lazily on the first alert and reused afterwards.
+// Browsers may create it suspended (autoplay policy) or close it, so it is resumed or replaced per alert.
+let alertAudioContext: AudioContext | null = null
+
+function getAlertAudioContext(): AudioContext {
+  if (!alertAudioContext || alertAudioContext.state === 'closed') {
+    alertAudioContext = new (window.AudioContext || (window as any).webkitAudioContext)()
+  }
+  if (alertAudioContext.state === 'suspended') {
+    alertAudioContext.resume().catch(error => {
+      console.log('❌ Audio context resume failed:', error)
+    })
+  }
+  return alertAudioContext
 }
 
 // ENHANCED: Multi-method notification system (like Python's guaranteed dialogs)
@@ -128,7 +176,7 @@ function showEnhancedNotification(title: string, message: string, onDismiss?: ()
   // Method 2: Audio alert (works across tabs, even when tab is inactive)
   try {
     // Create a more attention-grabbing sound sequence
-    const audioContext = new (window.AudioContext || (window as any).webkitAudioContext)()
+    const audioContext = getAlertAudioContext()
     
     // Create alert tone sequence (like system alert sounds)
     const playTone = (frequency: number, duration: number, delay: number) => {
@@ -217,7 +265,6 @@ export default function BlinkDetector() {
   
   // EXACT PORT: Python global variables converted to state
   const [blinkCount, setBlinkCount] = useState(0)
-  const [blinkTimestamps, setBlinkTimestamps] = useState<number[]>([])
   const [baselineEARBuffer, setBaselineEARBuffer] = useState<number[]>([])
   const [baselineEAR, setBaselineEAR] = useState<number | null>(null)
   const [lastAlertTime, setLastAlertTime] = useState(0)
@@ -231,6 +278,7 @@ export default function BlinkDetector() {
   const blinkTimestampsRef = useRef<number[]>([])
   const baselineEARRef = useRef<number | null>(null)
   const baselineEARBufferRef = useRef<number[]>([])
+  const adaptiveThresholdRef = useRef<number | null>(null) // Frozen once calibration completes
   
   // ENHANCED: Use ref for immediate alert cooldown tracking (prevents endless alerts)
   const lastAlertTimeRef = useRef(0)
@@ -238,7 +286,13 @@ export default function BlinkDetector() {
   const startTimeRef = useRef(startTime) // For immediate access in callbacks
   
   // Use ref for onResults function so MediaPipe always calls the latest version
-  const onResultsRef = useRef<((results: any) => void) | null>(null)
+  const onResultsRef = useRef<((results: any, replayed?: boolean) => void) | null>(null)
+  
+  // Landmarks from the last FaceMesh run, replayed on frames where inference is skipped
+  const lastResultsRef = useRef<FaceMeshResults | null>(null)
+  
+  // Cleanup for the running frame loop; non-null while a loop is active so only one ever runs
+  const stopProcessingRef = useRef<(() => void) | null>(null)
   
 
   
@@ -249,6 +303,9 @@ export default function BlinkDetector() {
   const [blinkRate, setBlinkRate] = useState(0)
   const [sessionDuration, setSessionDuration] = useState(0)
   const [isLowRate, setIsLowRate] = useState(false)
+  
+  // Last overlay refresh slot; readouts only hit React state when this changes
+  const lastOverlayTickRef = useRef(-1)
   const [lastResetTime, setLastResetTime] = useState<Date | null>(null)
   
   // ENHANCED: Alert modal state (like Python's system dialog)
@@ -288,7 +345,6 @@ export default function BlinkDetector() {
     setStartTime(resetTime)
     startTimeRef.current = resetTime // Update ref immediately
     // NOTE: blinkCount (total) is NOT reset - it's cumulative across sessions
-    setBlinkTimestamps([])
     blinkTimestampsRef.current = []
     setBlinkRate(0)
     setSessionDuration(0)
@@ -302,9 +358,11 @@ export default function BlinkDetector() {
   const resetCalibration = () => {
     console.log('🔄 Resetting calibration...')
     setBaselineEARBuffer([])
+    baselineEARBufferRef.current = []
     setBaselineEAR(null)
+    adaptiveThresholdRef.current = null
     // NOTE: blinkCount (total) is NOT reset - it's cumulative across sessions
-    setBlinkTimestamps([])
+    blinkTimestampsRef.current = []
     consecutiveBlinkFramesRef.current = 0
     const resetTime = Date.now()
     setStartTime(resetTime)
@@ -319,7 +377,6 @@ export default function BlinkDetector() {
     setStartTime(resetTime)
     startTimeRef.current = resetTime
     // NOTE: blinkCount (total) is NOT reset - it's cumulative across sessions
-    setBlinkTimestamps([])
     blinkTimestampsRef.current = []
     setBlinkRate(0)
     setSessionDuration(0)
@@ -361,6 +418,7 @@ export default function BlinkDetector() {
         
         faceMesh.onResults((results: any) => {
           // console.log('📊 MediaPipe results received:', results.multiFaceLandmarks ? 'Face detected' : 'No face')
+          lastResultsRef.current = { multiFaceLandmarks: results.multiFaceLandmarks }
           if (onResultsRef.current) {
             onResultsRef.current(results)
           }
@@ -542,8 +600,10 @@ export default function BlinkDetector() {
       console.log('📸 Requesting camera access...')
       const stream = await navigator.mediaDevices.getUserMedia({
         video: { 
+          // FaceMesh resizes to ~192/256px internally, so larger frames only cost upload/resize time
           width: { ideal: 640 }, 
           height: { ideal: 480 },
+          frameRate: { ideal: 30 }, // Matches the 30fps processing interval
           facingMode: 'user'
         }
       })
@@ -579,12 +639,18 @@ export default function BlinkDetector() {
 
   // Process video frames
   const processVideo = () => {
+    // Both MediaPipe init and video playback kick this off; never run two loops feeding one FaceMesh
+    if (stopProcessingRef.current) {
+      return stopProcessingRef.current
+    }
+    
     if (videoRef.current && faceMeshRef.current) {
       const video = videoRef.current
       const faceMesh = faceMeshRef.current
       let frameCount = 0
       let lastLogTime = Date.now()
       let processingInterval: NodeJS.Timeout | null = null
+      let lastSentVideoTime = -1
       
       const process = async () => {
         try {
@@ -595,6 +661,13 @@ export default function BlinkDetector() {
           
           const now = Date.now()
           const isHidden = document.hidden
+          const videoReady = video.readyState === 4 && !video.paused && !video.ended
+          
+          // Each send uploads and converts the full frame; skip ticks where the camera has no new frame
+          // (before logging, so a repeated tick doesn't re-log the same frame)
+          if (videoReady && video.currentTime === lastSentVideoTime) {
+            return
+          }
           
           // Enhanced logging every 30 frames OR every 5 seconds when hidden
           const shouldLog = (frameCount % 30 === 0) || (isHidden && now - lastLogTime > 5000)
@@ -607,9 +680,17 @@ export default function BlinkDetector() {
             }
           }
           
-          if (video.readyState === 4 && !video.paused && !video.ended) {
+          if (videoReady) {
+            lastSentVideoTime = video.currentTime
+            
             frameCount++
             
+            // Skip inference on this frame; replay cached landmarks so rate/alert bookkeeping keeps ticking
+            if (frameCount % INFERENCE_FRAME_STRIDE !== 0 && lastResultsRef.current) {
+              onResultsRef.current?.(lastResultsRef.current, true)
+              return
+            }
+            
             // ENHANCED: Track video frame freshness when hidden
             if (isHidden) {
               const videoCurrentTime = video.currentTime
@@ -728,12 +809,15 @@ export default function BlinkDetector() {
       startProcessing()
       
       // Cleanup function
-      return () => {
+      const stopProcessing = () => {
         if (processingInterval) {
           clearInterval(processingInterval)
         }
         document.removeEventListener('visibilitychange', handleVisibilityChange)
+        stopProcessingRef.current = null
       }
+      stopProcessingRef.current = stopProcessing
+      return stopProcessing
     } else {
       console.warn('⚠️ Video or FaceMesh not ready for processing')
       // Return empty cleanup function
@@ -742,12 +826,14 @@ export default function BlinkDetector() {
   }
 
   // EXACT PORT: Main detection logic from Python's main loop
-  const onResults = (results: any) => {
+  // `replayed` marks cached landmarks re-fed on frames where inference was skipped: they keep the
+  // rate/alert bookkeeping ticking but never count as MediaPipe results, calibration or blink samples
+  const onResults = (results: any, replayed = false) => {
     const isHidden = document.hidden
-    const now = Date.now()
+    const now = Date.now() // Single clock read per frame, shared by everything below
     
-    // ENHANCED: Track MediaPipe result frequency when hidden
-    if (isHidden) {
+    // ENHANCED: Track MediaPipe result frequency when hidden (replays are not MediaPipe results)
+    if (isHidden && !replayed) {
       const resultsTimeKey = 'lastResultsTime'
       const lastResultsTime = (window as any)[resultsTimeKey] || 0
       const timeSinceLastResult = now - lastResultsTime
@@ -761,7 +847,7 @@ export default function BlinkDetector() {
       }
       
       (window as any)[resultsTimeKey] = now
-    } else {
+    } else if (!isHidden) {
       // Reset counter when visible
       ;(window as any).hiddenResultCount = 0
     }
@@ -774,28 +860,28 @@ export default function BlinkDetector() {
     const faceLandmarks = results.multiFaceLandmarks[0]
     const frameWidth = videoRef.current?.videoWidth || 640
     const frameHeight = videoRef.current?.videoHeight || 480
-  
     
-    // EXACT PORT: get_eye_landmarks function from Python
-    const getEyeLandmarks = (indices: number[]) => {
-      return indices.map(i => ({
-        x: faceLandmarks[i].x * frameWidth,
-        y: faceLandmarks[i].y * frameHeight
-      }))
-    }
+    // Throttle the slow-changing readouts so they don't re-render the whole page every frame,
+    // and skip them entirely while the tab is hidden since nobody can see them
+    const overlayTick = Math.floor(now * OVERLAY_REFRESH_HZ / 1000)
+    const refreshOverlay = !isHidden && overlayTick !== lastOverlayTickRef.current
+    if (refreshOverlay) lastOverlayTickRef.current = overlayTick
     
-    const leftEye = getEyeLandmarks(LEFT_EYE)
-    const rightEye = getEyeLandmarks(RIGHT_EYE)
+    getEyeLandmarks(faceLandmarks, EYE_IDX, frameWidth, frameHeight, eyePoints)
     
     // Calculate EAR for both eyes
-    const leftEARValue = eyeAspectRatio(leftEye)
-    const rightEARValue = eyeAspectRatio(rightEye)
+    const leftEARValue = eyeAspectRatio(leftEyePoints)
+    const rightEARValue = eyeAspectRatio(rightEyePoints)
     
-    setLeftEAR(leftEARValue)
-    setRightEAR(rightEARValue)
+    if (refreshOverlay) {
+      setLeftEAR(leftEARValue)
+      setRightEAR(rightEARValue)
+    }
     
     // EXACT PORT: update_baseline_ear function from Python
     if (baselineEARBufferRef.current.length < BASELINE_FRAMES) {
+      if (replayed) return // Calibrate on real samples only
+      
       const avgEAR = (leftEARValue + rightEARValue) / 2.0
       const newBuffer = [...baselineEARBufferRef.current, avgEAR]
       setBaselineEARBuffer(newBuffer)
@@ -806,58 +892,55 @@ export default function BlinkDetector() {
       baselineEARRef.current = newBaseline // Keep ref in sync
       setStatusText(`Calibrating... ${newBuffer.length}/${BASELINE_FRAMES}`)
       
+      // Baseline is fixed from here on, so compute the threshold exactly once
+      if (newBuffer.length === BASELINE_FRAMES) {
+        adaptiveThresholdRef.current = newBaseline * EAR_THRESHOLD_RATIO
+      }
+      
       // Log calibration progress when hidden
       if (isHidden) {
         console.log(`📏 CALIBRATION while hidden: ${newBuffer.length}/${BASELINE_FRAMES}`)
       }
     } else {
       // EXACT PORT: Main detection logic from Python
-      if (baselineEARRef.current === null) return
-      
-      const adaptiveThreshold = baselineEARRef.current * EAR_THRESHOLD_RATIO
-      setStatusText(`Threshold: ${adaptiveThreshold.toFixed(3)}`)
+      const adaptiveThreshold = adaptiveThresholdRef.current
+      if (adaptiveThreshold === null) return
       
-      // EXACT PORT: Both eyes validation + minimum duration from Python
-      const bothEyesClosed = (leftEARValue < adaptiveThreshold) && (rightEARValue < adaptiveThreshold)
+      if (refreshOverlay) setStatusText(`Threshold: ${adaptiveThreshold.toFixed(3)}`)
       
-      if (bothEyesClosed) {
-        consecutiveBlinkFramesRef.current += 1
+      // EXACT PORT: Both eyes validation + minimum duration from Python (real samples only)
+      if (!replayed) {
+        const blinkFrames = consecutiveBlinkFramesRef.current
+        const nextBlinkFrames = stepBlinkFrames(leftEARValue, rightEARValue, adaptiveThreshold, blinkFrames)
+        consecutiveBlinkFramesRef.current = nextBlinkFrames
         
-        // Log blink detection when hidden
-        if (isHidden && consecutiveBlinkFramesRef.current === 1) {
-          console.log(`👁️ BLINK START detected while hidden: frames=${consecutiveBlinkFramesRef.current}`)
-        }
-      } else {
-        // Check if we had a valid blink
-        if (consecutiveBlinkFramesRef.current >= MIN_BLINK_FRAMES) {
-          const currentTime = Date.now()
-          
+        if (nextBlinkFrames > 0) {
+          // Log blink detection when hidden
+          if (isHidden && nextBlinkFrames === 1) {
+            console.log(`👁️ BLINK START detected while hidden: frames=${nextBlinkFrames}`)
+          }
+        } else if (blinkFrames >= MIN_BLINK_SAMPLES) {
+          // Eyes reopened after a valid blink
           setBlinkCount(prev => {
             const newCount = prev + 1
-            console.log(`👁️ Blink #${newCount} | Duration: ${consecutiveBlinkFramesRef.current} frames${isHidden ? ' (WHILE HIDDEN)' : ''}`)
+            console.log(`👁️ Blink #${newCount} | Duration: ~${blinkFrames * INFERENCE_FRAME_STRIDE} frames${isHidden ? ' (WHILE HIDDEN)' : ''}`)
             return newCount
           })
           
-          setBlinkTimestamps(prev => {
-            const newTimestamps = [...prev, currentTime]
-            // Clean old timestamps
-            const cutoffTime = currentTime - (ROLLING_WINDOW_MINUTES * 60 * 1000)
-            const filtered = newTimestamps.filter(t => t >= cutoffTime)
-            blinkTimestampsRef.current = filtered // Keep ref in sync
-            return filtered
-          })
+          blinkTimestampsRef.current.push(now)
         }
-        
-        consecutiveBlinkFramesRef.current = 0
       }
       
+      // Slide the rolling window forward
+      evictExpired(blinkTimestampsRef.current, now - (ROLLING_WINDOW_MINUTES * 60 * 1000))
+      
       // Calculate current blink rate
-      const currentRate = calculateBlinkRate(blinkTimestampsRef.current, ROLLING_WINDOW_MINUTES, startTimeRef.current)
-      setBlinkRate(currentRate)
+      const currentRate = calculateBlinkRate(blinkTimestampsRef.current, ROLLING_WINDOW_MINUTES, startTimeRef.current, now)
+      if (refreshOverlay) setBlinkRate(currentRate)
       
       // EXACT PORT: check_low_blink_rate from Python
-      const sessionTime = (Date.now() - startTimeRef.current) / 1000
-      setSessionDuration(sessionTime)
+      const sessionTime = (now - startTimeRef.current) / 1000
+      if (refreshOverlay) setSessionDuration(sessionTime)
       
       const isLow = currentRate < lowBlinkThreshold
       setIsLowRate(isLow && sessionTime >= MIN_SESSION_TIME && blinkTimestampsRef.current.length >= MIN_BLINKS_FOR_ALERT)
@@ -868,8 +951,7 @@ export default function BlinkDetector() {
       }
       
       // ENHANCED: Fixed cooldown mechanism (prevents endless alerts)
-      const currentTime = Date.now()
-      const timeSinceLastAlert = currentTime - lastAlertTimeRef.current
+      const timeSinceLastAlert = now - lastAlertTimeRef.current
       const canAlert = !isAlertActiveRef.current && timeSinceLastAlert > (ALERT_COOLDOWN * 1000)
       
       // Debug: Log alert conditions every time they're checked
@@ -885,8 +967,8 @@ export default function BlinkDetector() {
         
         // Set alert as active immediately to prevent multiple triggers
         isAlertActiveRef.current = true
-        lastAlertTimeRef.current = currentTime
-        setLastAlertTime(currentTime)
+        lastAlertTimeRef.current = now
+        setLastAlertTime(now)
         
         console.log(`⚠️ LOW BLINK RATE ALERT FIRED: Rate=${currentRate.toFixed(1)}/min vs Threshold=${lowBlinkThreshold}/min${isHidden ? ' (WHILE HIDDEN)' : ''}`)
         
@@ -910,10 +992,6 @@ export default function BlinkDetector() {
   // console.log(`🔄 onResults ref updated with threshold: ${lowBlinkThreshold}`)
 
   // Sync refs with state
-  useEffect(() => {
-    blinkTimestampsRef.current = blinkTimestamps
-  }, [blinkTimestamps])
-  
   useEffect(() => {
     baselineEARRef.current = baselineEAR
   }, [baselineEAR])